@@ -2,18 +2,14 @@
 
 from openpyxl.chart import PieChart, BarChart, Reference
 from openpyxl.chart.label import DataLabelList
-from openpyxl.chart.series import SeriesLabel
+from openpyxl.chart.series import SeriesLabel, DataPoint
+from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl.drawing.colors import ColorChoice
 from collections import Counter, defaultdict
 from chart_colors import assign_colors_to_series, get_issue_type_color, get_status_color
 
 def apply_colors_to_pie_chart(pie_chart, items, color_map_func):
     """Apply consistent colors to pie chart series based on configuration."""
-    from openpyxl.chart.series import DataPoint
-    from openpyxl.chart.shapes import GraphicalProperties
-    from openpyxl.drawing.fill import PatternFillProperties
-    from openpyxl.drawing.colors import ColorChoice
-    
     color_assignments = assign_colors_to_series(items, color_map_func)
     
     # Create data points for each slice with colors
@@ -31,6 +27,16 @@ def apply_colors_to_pie_chart(pie_chart, items, color_map_func):
     if len(pie_chart.series) > 0:
         pie_chart.series[0].data_points = data_points
 
+def count_by_status_and_type(issues):
+    """Counts issues by status name and by issue type name in a single pass."""
+    status_counts = Counter()
+    type_counts = Counter()
+    for issue in issues:
+        fields = issue.get('fields', {})
+        status_counts[fields.get('status', {}).get('name', 'Unknown')] += 1
+        type_counts[fields.get('issuetype', {}).get('name', 'Unknown')] += 1
+    return status_counts, type_counts
+
 def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
     """Creates a charts sheet with improved formatting and labels."""
     ws_charts = wb.create_sheet(title="Charts")
@@ -43,14 +49,13 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
     ws_charts.append(['Issues by Status Analysis'])
     ws_charts.append(['Status', 'Count'])
     
-    # Count issues by status using Python instead of Excel formulas
-    status_counts = Counter()
-    for issue in issues:
-        status = issue.get('fields', {}).get('status', {}).get('name', 'Unknown')
-        status_counts[status] += 1
+    # Count issues by status and type using Python instead of Excel formulas
+    status_counts, type_counts = count_by_status_and_type(issues)
     
     status_start_row = 3
-    for i, (status, count) in enumerate(sorted(status_counts.items())):
+    sorted_statuses = sorted(status_counts)
+    for i, status in enumerate(sorted_statuses):
+        count = status_counts[status]
         row = status_start_row + i
         ws_charts.cell(row=row, column=1, value=status)
         ws_charts.cell(row=row, column=2, value=count)
@@ -70,7 +75,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
     pie_status.set_categories(labels)
     
     # Apply colors based on status configuration
-    apply_colors_to_pie_chart(pie_status, sorted(status_counts.keys()), get_status_color)
+    apply_colors_to_pie_chart(pie_status, sorted_statuses, get_status_color)
     
     # Configure chart appearance - show only value and percentage
     pie_status.dataLabels = DataLabelList()
@@ -87,14 +92,10 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
     ws_charts.cell(row=type_start_row, column=1, value='Issue Type')
     ws_charts.cell(row=type_start_row, column=2, value='Count')
     
-    # Count issues by type using Python
-    type_counts = Counter()
-    for issue in issues:
-        issue_type = issue.get('fields', {}).get('issuetype', {}).get('name', 'Unknown')
-        type_counts[issue_type] += 1
-    
     type_data_start = type_start_row + 1
-    for i, (issue_type, count) in enumerate(sorted(type_counts.items())):
+    sorted_types = sorted(type_counts)
+    for i, issue_type in enumerate(sorted_types):
+        count = type_counts[issue_type]
         row = type_data_start + i
         ws_charts.cell(row=row, column=1, value=issue_type)
         ws_charts.cell(row=row, column=2, value=count)
@@ -114,7 +115,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
     pie_type.set_categories(labels_type)
     
     # Apply colors based on issue type configuration
-    apply_colors_to_pie_chart(pie_type, sorted(type_counts.keys()), get_issue_type_color)
+    apply_colors_to_pie_chart(pie_type, sorted_types, get_issue_type_color)
     
     # Configure chart appearance - show only value and percentage
     pie_type.dataLabels = DataLabelList()
@@ -141,7 +142,9 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
             time_by_type[issue_type] += hours
         
         time_data_start = time_start_row + 1
-        for i, (issue_type, hours) in enumerate(sorted(time_by_type.items())):
+        sorted_time_types = sorted(time_by_type)
+        for i, issue_type in enumerate(sorted_time_types):
+            hours = time_by_type[issue_type]
             row = time_data_start + i
             ws_charts.cell(row=row, column=1, value=issue_type)
             ws_charts.cell(row=row, column=2, value=round(hours, 2))
@@ -161,7 +164,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
         pie_time.set_categories(labels_time)
         
         # Apply colors based on issue type configuration
-        apply_colors_to_pie_chart(pie_time, sorted(time_by_type.keys()), get_issue_type_color)
+        apply_colors_to_pie_chart(pie_time, sorted_time_types, get_issue_type_color)
         
         # Configure chart appearance - show only value and percentage
         pie_time.dataLabels = DataLabelList()
@@ -351,14 +354,13 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
             ws_charts.cell(row=current_row + 1, column=1, value='Status')
             ws_charts.cell(row=current_row + 1, column=2, value='Count')
             
-            # Count issues by status for this sprint
-            sprint_status_counts = Counter()
-            for issue in sprint_issues:
-                status = issue.get('fields', {}).get('status', {}).get('name', 'Unknown')
-                sprint_status_counts[status] += 1
+            # Count issues by status and type for this sprint
+            sprint_status_counts, sprint_type_counts = count_by_status_and_type(sprint_issues)
             
             sprint_status_start = current_row + 2
-            for i, (status, count) in enumerate(sorted(sprint_status_counts.items())):
+            sorted_sprint_statuses = sorted(sprint_status_counts)
+            for i, status in enumerate(sorted_sprint_statuses):
+                count = sprint_status_counts[status]
                 row = sprint_status_start + i
                 ws_charts.cell(row=row, column=1, value=status)
                 ws_charts.cell(row=row, column=2, value=count)
@@ -378,7 +380,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
             pie_sprint_status.set_categories(labels_sprint_status)
             
             # Apply colors based on status configuration
-            apply_colors_to_pie_chart(pie_sprint_status, sorted(sprint_status_counts.keys()), get_status_color)
+            apply_colors_to_pie_chart(pie_sprint_status, sorted_sprint_statuses, get_status_color)
             
             # Configure chart appearance - show only value and percentage
             pie_sprint_status.dataLabels = DataLabelList()
@@ -400,14 +402,10 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
             ws_charts.cell(row=current_row + 1, column=1, value='Issue Type')
             ws_charts.cell(row=current_row + 1, column=2, value='Count')
             
-            # Count issues by type for this sprint
-            sprint_type_counts = Counter()
-            for issue in sprint_issues:
-                issue_type = issue.get('fields', {}).get('issuetype', {}).get('name', 'Unknown')
-                sprint_type_counts[issue_type] += 1
-            
             sprint_type_start = current_row + 2
-            for i, (issue_type, count) in enumerate(sorted(sprint_type_counts.items())):
+            sorted_sprint_types = sorted(sprint_type_counts)
+            for i, issue_type in enumerate(sorted_sprint_types):
+                count = sprint_type_counts[issue_type]
                 row = sprint_type_start + i
                 ws_charts.cell(row=row, column=1, value=issue_type)
                 ws_charts.cell(row=row, column=2, value=count)
@@ -427,7 +425,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
             pie_sprint_type.set_categories(labels_sprint_type)
             
             # Apply colors based on issue type configuration
-            apply_colors_to_pie_chart(pie_sprint_type, sorted(sprint_type_counts.keys()), get_issue_type_color)
+            apply_colors_to_pie_chart(pie_sprint_type, sorted_sprint_types, get_issue_type_color)
             
             # Configure chart appearance - show only value and percentage
             pie_sprint_type.dataLabels = DataLabelList()
@@ -462,7 +460,9 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
                         sprint_time_by_type[issue_type] += hours
                     
                     sprint_time_start = current_row + 2
-                    for i, (issue_type, hours) in enumerate(sorted(sprint_time_by_type.items())):
+                    sorted_sprint_time_types = sorted(sprint_time_by_type)
+                    for i, issue_type in enumerate(sorted_sprint_time_types):
+                        hours = sprint_time_by_type[issue_type]
                         row = sprint_time_start + i
                         ws_charts.cell(row=row, column=1, value=issue_type)
                         ws_charts.cell(row=row, column=2, value=round(hours, 2))
@@ -482,7 +482,7 @@ def create_clean_charts_sheet(wb, issues, worklogs=None, issues_by_sprint=None):
                     pie_sprint_time.set_categories(labels_sprint_time)
                     
                     # Apply colors based on issue type configuration
-                    apply_colors_to_pie_chart(pie_sprint_time, sorted(sprint_time_by_type.keys()), get_issue_type_color)
+                    apply_colors_to_pie_chart(pie_sprint_time, sorted_sprint_time_types, get_issue_type_color)
                     
                     # Configure chart appearance - show only value and percentage
                     pie_sprint_time.dataLabels = DataLabelList()
@@ -41,19 +41,10 @@ def get_story_points(issue_fields):
     Returns:
         float: Story points value (0 if both fields are null)
     """
-    sp_field = issue_fields.get(JIRA_STORY_POINTS_FIELD)
-    sp_estimate_field = issue_fields.get(JIRA_STORY_POINTS_ESTIMATE_FIELD)
-    
-    # Both null - return 0
-    if sp_field is None and sp_estimate_field is None:
-        return 0
-    
-    # Both not null - use Story Points (priority)
-    if sp_field is not None and sp_estimate_field is not None:
-        return float(sp_field) if sp_field else 0
-    
-    # One is not null - use that one
-    value = sp_field if sp_field is not None else sp_estimate_field
+    # Story Points has priority; the estimate field is only read when it is null
+    value = issue_fields.get(JIRA_STORY_POINTS_FIELD)
+    if value is None:
+        value = issue_fields.get(JIRA_STORY_POINTS_ESTIMATE_FIELD)
     return float(value) if value else 0
 
 def validate_config():
@@ -4,12 +4,66 @@ from openpyxl import Workbook
 from openpyxl.chart import PieChart, BarChart, LineChart, Reference
 from openpyxl.chart.label import DataLabelList
 from openpyxl.worksheet.table import Table, TableStyleInfo
-from collections import Counter
+from collections import Counter, defaultdict, namedtuple
 from charts_helper_enhanced import create_clean_charts_sheet
 from config import get_story_points
-from progress_data_aggregator import calculate_epic_progress, calculate_sprint_composition
+from progress_data_aggregator import aggregate_issues, calculate_epic_progress
 from progress_charts_helper import create_percentage_bar_chart, create_stacked_bar_chart, create_composition_pie_chart
 
+# The issue columns shared by the sprint and epic sheets
+IssueColumns = namedtuple('IssueColumns', [
+    'key', 'issue_type', 'summary', 'status', 'parent_summary',
+    'story_points', 'parent_key', 'status_category'
+])
+
+def _issue_columns(issue):
+    """
+    Extracts the common issue columns, reading the issue's fields only once.
+    
+    Args:
+        issue: Issue dictionary from Jira API
+        
+    Returns:
+        IssueColumns for the issue
+    """
+    fields = issue.get('fields', {})
+    status = fields.get('status', {})
+    
+    parent_summary = 'N/A'
+    parent_key = 'N/A'
+    parent_field = fields.get('parent')
+    if parent_field:
+        parent_summary = parent_field.get('fields', {}).get('summary', 'N/A')
+        parent_key = parent_field.get('key', 'N/A')
+    
+    return IssueColumns(
+        key=issue.get('key'),
+        issue_type=fields.get('issuetype', {}).get('name', 'N/A'),
+        summary=fields.get('summary'),
+        status=status.get('name', 'N/A'),
+        parent_summary=parent_summary,
+        story_points=get_story_points(fields),  # Story points with fallback logic
+        parent_key=parent_key,
+        status_category=status.get('statusCategory', {}).get('name', 'N/A')
+    )
+
+def _issue_row(columns, sprint_name=None):
+    """
+    Builds an issue sheet row in header order.
+    
+    Args:
+        columns: IssueColumns of the issue
+        sprint_name: Value for the Sprint column, which follows Status (None for sheets without one)
+        
+    Returns:
+        List of cell values
+    """
+    row = [columns.key, columns.issue_type, columns.summary, columns.status]
+    if sprint_name is not None:
+        row.append(sprint_name)
+    row += [columns.parent_summary, columns.story_points, columns.parent_key, columns.status_category]
+    return row
+
 class ExcelExporter:
     """Handles Excel export functionality."""
     
@@ -18,6 +72,14 @@ class ExcelExporter:
     
     def save_to_excel(self, issues, worklogs, comments, filename="JiraExport.xlsx", issues_by_sprint=None, epic_label_issues=None, open_epic_issues=None):
         """Saves the fetched data to an Excel file with separate sheets and charts."""
+        # Nothing to export - skip building an empty workbook altogether. The epic
+        # arguments are always dicts, so check the issues they hold.
+        has_sprint_issues = any(sprint_data['issues'] for sprint_data in (issues_by_sprint or {}).values())
+        has_epic_issues = bool(epic_label_issues and epic_label_issues['issues'])
+        has_open_epic_issues = bool(open_epic_issues and open_epic_issues['issues'])
+        if not any([issues, worklogs, comments, has_sprint_issues, has_epic_issues, has_open_epic_issues]):
+            return False, None, "No data was fetched to save."
+        
         self.wb = Workbook()
         
         # Remove default sheet
@@ -41,30 +103,7 @@ class ExcelExporter:
                 ws_issues.append(['Issue Key', 'Issue Type', 'Summary', 'Status', 'Sprint', 'Parent Summary', 'Story Points', 'Parent Key', 'Status Category'])
                 
                 for issue in sprint_issues:
-                    parent_summary = 'N/A'
-                    parent_key = 'N/A'
-                    parent_field = issue.get('fields', {}).get('parent')
-                    if parent_field:
-                        parent_summary = parent_field.get('fields', {}).get('summary', 'N/A')
-                        parent_key = parent_field.get('key', 'N/A')
-                    
-                    # Get story points with fallback logic
-                    story_points = get_story_points(issue.get('fields', {}))
-                    
-                    # Get status category
-                    status_category = issue.get('fields', {}).get('status', {}).get('statusCategory', {}).get('name', 'N/A')
-                    
-                    ws_issues.append([
-                        issue.get('key'),
-                        issue.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
-                        issue.get('fields', {}).get('summary'),
-                        issue.get('fields', {}).get('status', {}).get('name', 'N/A'),
-                        sprint_name,
-                        parent_summary,
-                        story_points,
-                        parent_key,
-                        status_category
-                    ])
+                    ws_issues.append(_issue_row(_issue_columns(issue), sprint_name))
                 
                 sheets_created.append(sheet_title)
         elif issues:
@@ -79,31 +118,8 @@ class ExcelExporter:
                 ws_issues.append(['Issue Key', 'Issue Type', 'Summary', 'Status', 'Parent Summary', 'Story Points', 'Parent Key', 'Status Category'])
             
             for issue in issues:
-                parent_summary = 'N/A'
-                parent_key = 'N/A'
-                parent_field = issue.get('fields', {}).get('parent')
-                if parent_field:
-                    parent_summary = parent_field.get('fields', {}).get('summary', 'N/A')
-                    parent_key = parent_field.get('key', 'N/A')
-                
-                # Get story points with fallback logic
-                story_points = get_story_points(issue.get('fields', {}))
-                
-                # Get status category
-                status_category = issue.get('fields', {}).get('status', {}).get('statusCategory', {}).get('name', 'N/A')
-                
-                row_data = [
-                    issue.get('key'),
-                    issue.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
-                    issue.get('fields', {}).get('summary'),
-                    issue.get('fields', {}).get('status', {}).get('name', 'N/A')
-                ]
-                
-                if has_sprint_info:
-                    row_data.append(issue.get('sprint_name', ''))
-                
-                row_data.extend([parent_summary, story_points, parent_key, status_category])
-                ws_issues.append(row_data)
+                sprint_name = issue.get('sprint_name', '') if has_sprint_info else None
+                ws_issues.append(_issue_row(_issue_columns(issue), sprint_name))
             
             sheets_created.append("Sprint Issues")
         
@@ -116,11 +132,11 @@ class ExcelExporter:
             ])
             
             for log in worklogs:
-                ws_worklogs.append([
+                ws_worklogs.append((
                     log['issueKey'], log['issueType'], log['summary'], log['status'],
-                    log['author'], log['timeSpent'], log['timeSpentHours'], 
+                    log['author'], log['timeSpent'], log['timeSpentHours'],
                     log['startedDate'], log['sprint'], log['comment']
-                ])
+                ))
             
             sheets_created.append("Work Logs")
         
@@ -133,11 +149,11 @@ class ExcelExporter:
             ])
             
             for comment in comments:
-                ws_comments.append([
+                ws_comments.append((
                     comment['issueKey'], comment['summary'], comment['status'],
                     comment['parent_summary'], comment['issueType'], comment['comment_date'],
                     comment['comment_author'], comment['comment_body']
-                ])
+                ))
             
             sheets_created.append("Comments")
         
@@ -163,7 +179,7 @@ class ExcelExporter:
         
         # Create Time Tracking sheet with pivot tables (only if worklogs exist)
         if worklogs and len(worklogs) > 0:
-            time_tracking_sheet = self._create_time_tracking_sheet()
+            time_tracking_sheet = self._create_time_tracking_sheet(worklogs)
             if time_tracking_sheet:
                 sheets_created.append(time_tracking_sheet)
         
@@ -196,38 +212,15 @@ class ExcelExporter:
         epic_statuses = epic_data.get('epic_statuses', {})
         
         for issue in issues:
-            parent_summary = 'N/A'
-            parent_key = 'N/A'
-            epic_status = 'N/A'
-            
-            parent_field = issue.get('fields', {}).get('parent')
-            if parent_field:
-                parent_summary = parent_field.get('fields', {}).get('summary', 'N/A')
-                parent_key = parent_field.get('key', 'N/A')
-                # Get epic status from the epic_statuses dict
-                epic_status = epic_statuses.get(parent_key, 'N/A')
-            
-            # Get story points with fallback logic
-            story_points = get_story_points(issue.get('fields', {}))
+            columns = _issue_columns(issue)
             
-            # Get status category
-            status_category = issue.get('fields', {}).get('status', {}).get('statusCategory', {}).get('name', 'N/A')
+            # Get epic status from the epic_statuses dict (parent key is 'N/A' without a parent)
+            epic_status = epic_statuses.get(columns.parent_key, 'N/A')
             
             # Get sprint info if available (empty string if no sprint)
             sprint_name = issue.get('sprint_name', '')
             
-            ws.append([
-                issue.get('key'),
-                issue.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
-                issue.get('fields', {}).get('summary'),
-                issue.get('fields', {}).get('status', {}).get('name', 'N/A'),
-                sprint_name,
-                parent_summary,
-                story_points,
-                parent_key,
-                status_category,
-                epic_status
-            ])
+            ws.append(_issue_row(columns, sprint_name) + [epic_status])
     
     def _create_progress_sheet(self, issues_by_sprint=None, epic_label_issues=None, open_epic_issues=None):
         """
@@ -253,8 +246,9 @@ class ExcelExporter:
                 sprint_issues = sprint_data['issues']
                 sprint_name = sprint_data['name']
                 
-                # Calculate epic progress for this sprint
-                epic_progress = calculate_epic_progress(sprint_issues)
+                # Calculate epic progress and composition for this sprint in one pass
+                sprint_aggregates = aggregate_issues(sprint_issues)
+                epic_progress = sprint_aggregates['epic_progress']
                 
                 if epic_progress:  # Only create charts if there's data
                     # Chart 1: Sprint Progress in Percentage (Column A-B)
@@ -272,7 +266,7 @@ class ExcelExporter:
                     ws.add_chart(chart2, f"Q{current_row}")  # Column Q (17)
                     
                     # Chart 3: Sprint Composition (Pie) (Column I-J)
-                    composition_data = calculate_sprint_composition(sprint_issues)
+                    composition_data = sprint_aggregates['composition']
                     if composition_data:
                         chart3, end_row3 = create_composition_pie_chart(
                             ws, composition_data, current_row, 9,  # Start at column 9 (I)
@@ -326,40 +320,28 @@ class ExcelExporter:
         
         return "Progress"
     
-    def _create_time_tracking_sheet(self):
+    def _create_time_tracking_sheet(self, worklogs):
         """
         Creates Time Tracking sheet with aggregated time data for easy pivot table creation.
         
         Note: This creates formatted tables that users can easily convert to pivot tables in Excel.
         The data is pre-aggregated and organized for time tracking analysis.
         
+        Args:
+            worklogs: List of worklog dicts (same data written to the Work Logs sheet)
+        
         Returns:
             str: Sheet name if created, None otherwise
         """
-        # Check if Work Logs sheet exists
-        if "Work Logs" not in self.wb.sheetnames:
-            return None
-        
-        work_logs_sheet = self.wb["Work Logs"]
-        
-        # Get worklog data from the sheet
-        # Columns: Issue Key(A), Issue Type(B), Summary(C), Status(D), Author(E), Time Spent(F), Time Spent Hours(G), Date(H), Sprint(I), Comment(J)
-        max_row = work_logs_sheet.max_row
-        if max_row <= 1:  # Only header row or empty
-            return None
-        
-        # Read all worklog data
+        # Use the worklog records directly rather than reading cells back from the Work Logs sheet
         worklogs_data = []
-        for row in range(2, max_row + 1):  # Skip header
-            issue_key = work_logs_sheet.cell(row, 1).value
-            author = work_logs_sheet.cell(row, 5).value
-            date = work_logs_sheet.cell(row, 8).value  # Date is column H (8)
-            hours = work_logs_sheet.cell(row, 7).value or 0  # Time Spent Hours is column G (7)
+        for log in worklogs:
+            hours = log.get('timeSpentHours') or 0
             
             worklogs_data.append({
-                'issue_key': issue_key,
-                'author': author,
-                'date': date,
+                'issue_key': log.get('issueKey'),
+                'author': log.get('author'),
+                'date': log.get('startedDate'),
                 'hours': float(hours) if hours else 0
             })
         
@@ -389,7 +371,6 @@ class ExcelExporter:
             ws.cell(current_row, col).font = ws.cell(current_row, col).font.copy(bold=True)
         
         # Aggregate by date, author, and issue key
-        from collections import defaultdict
         date_author_issue_hours = defaultdict(float)
         for wl in worklogs_data:
             key = (wl['date'], wl['author'], wl['issue_key'])
@@ -439,7 +420,6 @@ class ExcelExporter:
             ws.cell(current_row, col).font = ws.cell(current_row, col).font.copy(bold=True)
         
         # Aggregate by author and date
-        from collections import defaultdict
         author_date_hours = defaultdict(float)
         for wl in worklogs_data:
             key = (wl['author'], wl['date'])
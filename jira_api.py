@@ -1,17 +1,76 @@
 """Jira API client module for data extraction."""
 
+import re
 import requests
-from datetime import datetime, timezone
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta, timezone
 from config import JIRA_API_URL, JIRA_STORY_POINTS_FIELD, JIRA_STORY_POINTS_ESTIMATE_FIELD, get_auth
-from utils import parse_adf_to_text, paginate_request
+from utils import parse_adf_to_text, paginate_request, parse_jira_datetime, REQUEST_TIMEOUT
+
+# Connection pool sizing for the shared session (requests may run from several threads)
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+# Upper bound on concurrent per-issue lookups (issue details, sprints)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Rate limiting (429) and transient server errors are retried with exponential backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session():
+    """
+    Creates a requests session with a pooled HTTP adapter.
+    
+    Connections (and their TLS handshakes) are reused across calls. Connection
+    errors, rate limiting and transient server errors are retried with an
+    exponential backoff, waiting for Jira's Retry-After header when it is sent.
+    
+    The session keeps no cookies: it may be shared by clients with different
+    credentials, and a Jira session cookie would authenticate them all as the
+    first user.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUS_CODES,
+        # /worklog/list is a read-only POST, so it is safe to retry too
+        allowed_methods=frozenset(['GET', 'POST']),
+        respect_retry_after_header=True,
+        # Hand the last response back so raise_for_status() reports the real status
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class JiraAPIClient:
     """Client for interacting with Jira API."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.base_url = JIRA_API_URL
-        self.auth = get_auth()
+    def __init__(self, base_url=None, auth=None, session=None, log=print):
+        """
+        Args:
+            base_url: Jira instance URL (defaults to JIRA_API_URL from the configuration)
+            auth: (email, API token) tuple (defaults to the configured credentials)
+            session: requests session to send requests with (defaults to a new create_session())
+            log: Callable that receives progress and warning messages (defaults to print)
+        """
+        self.session = session or create_session()
+        self.log = log
+        self.base_url = base_url or JIRA_API_URL
+        self.auth = auth or get_auth()
         self.headers = {"Accept": "application/json"}
     
     def get_issues_in_sprint(self, project_key, sprint_id, jql=None):
@@ -39,7 +98,8 @@ class JiraAPIClient:
         
         try:
             issues = paginate_request(
-                self.session, agile_url, self.headers, params, self.auth
+                self.session, agile_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             return issues
         except requests.exceptions.RequestException as e:
@@ -55,12 +115,13 @@ class JiraAPIClient:
             response = self.session.get(
                 sprint_url,
                 headers=self.headers,
-                auth=self.auth
+                auth=self.auth,
+                timeout=REQUEST_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"Warning: Could not fetch sprint details for sprint {sprint_id}: {str(e)}")
+            self.log(f"Warning: Could not fetch sprint details for sprint {sprint_id}: {str(e)}")
             return None
     
     def get_issue_sprints(self, issue_key):
@@ -79,7 +140,8 @@ class JiraAPIClient:
                 url,
                 params=params,
                 headers=self.headers,
-                auth=self.auth
+                auth=self.auth,
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code != 200:
@@ -148,7 +210,6 @@ class JiraAPIClient:
                         sprint_str = str(sprint_data)
                         
                         # Try to parse sprint ID and name from string
-                        import re
                         id_match = re.search(r'id=(\d+)', sprint_str)
                         name_match = re.search(r'name=([^,\]]+)', sprint_str)
                         state_match = re.search(r'state=([^,\]]+)', sprint_str)
@@ -163,9 +224,48 @@ class JiraAPIClient:
             return sprint_info_list
             
         except Exception as e:
-            print(f"Warning: Could not fetch sprint information for issue {issue_key}: {str(e)}")
+            self.log(f"Warning: Could not fetch sprint information for issue {issue_key}: {str(e)}")
             return []
     
+    def _get_sprint_names(self, issue_key):
+        """Returns an issue's sprint names for display ("; "-separated), or 'N/A'."""
+        sprint_info_list = self.get_issue_sprints(issue_key)
+        if not sprint_info_list:
+            return 'N/A'
+        return "; ".join(sprint.get('name', 'Unknown') for sprint in sprint_info_list)
+    
+    def _get_issue_details(self, issue_id, project_key):
+        """
+        Fetches basic details and sprint names for an issue referenced by a worklog.
+        
+        Returns:
+            Tuple (issue_data, sprint_names), or None if the issue could not be
+            fetched or belongs to another project
+        """
+        issue_url = f"{self.base_url}/rest/api/3/issue/{issue_id}"
+        issue_response = self.session.get(
+            issue_url,
+            headers=self.headers,
+            params={'fields': 'project,summary,issuetype,status,key'},
+            auth=self.auth,
+            timeout=REQUEST_TIMEOUT
+        )
+        
+        if issue_response.status_code != 200:
+            return None
+        
+        issue_data = issue_response.json()
+        issue_project = issue_data.get('fields', {}).get('project', {}).get('key', '')
+        
+        # Only process issues from the target project
+        if issue_project.upper() != project_key.upper():
+            return None
+        
+        # Get comprehensive sprint information for this issue
+        issue_key = issue_data.get('key')
+        sprint_names = self._get_sprint_names(issue_key) if issue_key else 'N/A'
+        return issue_data, sprint_names
+    
     def get_all_worklogs_in_date_range(self, project_key, start_date, end_date):
         """
         Fetches all worklogs within a date range for a project using the worklog search API.
@@ -187,7 +287,8 @@ class JiraAPIClient:
             # Get all worklog IDs updated in the time range
             worklog_ids = paginate_request(
                 self.session, worklog_search_url, self.headers, params, self.auth,
-                max_results_key='maxResults', start_at_key='startAt'
+                max_results_key='maxResults', start_at_key='startAt', results_key='values',
+                log=self.log
             )
             
             if not worklog_ids:
@@ -204,13 +305,17 @@ class JiraAPIClient:
             if not ids:
                 return []
             
-            # Fetch detailed worklog information in batches
-            all_worklogs_raw = []
+            # Fetch detailed worklog information in batches, keeping only the
+            # worklogs within the date range and collecting their unique issue IDs
+            filtered_worklogs = []
+            unique_issue_ids = set()
+            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
             batch_size = 1000  # Jira API limit
+            worklog_details_url = f"{self.base_url}/rest/api/3/worklog/list"
             
             for i in range(0, len(ids), batch_size):
                 batch_ids = ids[i:i + batch_size]
-                worklog_details_url = f"{self.base_url}/rest/api/3/worklog/list"
                 
                 payload = {
                     "ids": batch_ids,
@@ -221,78 +326,45 @@ class JiraAPIClient:
                     worklog_details_url,
                     json=payload,
                     headers={**self.headers, "Content-Type": "application/json"},
-                    auth=self.auth
+                    auth=self.auth,
+                    timeout=REQUEST_TIMEOUT
                 )
                 response.raise_for_status()
                 
-                worklogs_batch = response.json()
-                all_worklogs_raw.extend(worklogs_batch)
-            
-            # Step 1: Filter worklogs by date range and collect unique issue IDs
-            filtered_worklogs = []
-            unique_issue_ids = set()
-            
-            for worklog in all_worklogs_raw:
-                # Check if worklog is within date range
-                worklog_started_str = worklog.get('started')
-                if worklog_started_str:
-                    # Fix timezone format if needed
-                    if worklog_started_str[-3] != ':':
-                        worklog_started_str = worklog_started_str[:-2] + ':' + worklog_started_str[-2:]
-                    
-                    # Parse the worklog date and keep it in its original timezone
-                    worklog_datetime = datetime.fromisoformat(worklog_started_str)
-                    
-                    # Convert to date only for comparison
-                    worklog_date = worklog_datetime.date()
-                    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    
-                    if start_date_obj <= worklog_date <= end_date_obj:
-                        issue_id = worklog.get('issueId')
-                        if issue_id:
-                            filtered_worklogs.append((worklog, worklog_date))
-                            unique_issue_ids.add(issue_id)
+                # Step 1: Filter this batch by date range before fetching the next one
+                for worklog in response.json():
+                    # Check if worklog is within date range
+                    worklog_started_str = worklog.get('started')
+                    if worklog_started_str:
+                        # Parse the worklog date and keep it in its original timezone
+                        worklog_datetime = parse_jira_datetime(worklog_started_str)
+                        
+                        # Convert to date only for comparison
+                        worklog_date = worklog_datetime.date()
+                        
+                        if start_date_obj <= worklog_date <= end_date_obj:
+                            issue_id = worklog.get('issueId')
+                            if issue_id:
+                                filtered_worklogs.append((worklog, worklog_date))
+                                unique_issue_ids.add(issue_id)
             
             if not filtered_worklogs:
                 return []
             
             # Step 2: Fetch issue details for unique issues (batch processing)
-            print(f"Fetching details for {len(unique_issue_ids)} unique issues...")
+            self.log(f"Fetching details for {len(unique_issue_ids)} unique issues...")
             issue_details_cache = {}
             issue_sprint_cache = {}
             
-            for issue_id in unique_issue_ids:
-                # Get basic issue details
-                issue_url = f"{self.base_url}/rest/api/3/issue/{issue_id}"
-                issue_response = self.session.get(
-                    issue_url,
-                    headers=self.headers,
-                    params={'fields': 'project,summary,issuetype,status,key'},
-                    auth=self.auth
+            # Issues are independent, so their lookups run concurrently on the shared session
+            issue_ids = list(unique_issue_ids)
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                details = executor.map(
+                    lambda issue_id: self._get_issue_details(issue_id, project_key), issue_ids
                 )
-                
-                if issue_response.status_code == 200:
-                    issue_data = issue_response.json()
-                    issue_project = issue_data.get('fields', {}).get('project', {}).get('key', '')
-                    
-                    # Only process issues from the target project
-                    if issue_project.upper() == project_key.upper():
-                        issue_key = issue_data.get('key')
-                        issue_details_cache[issue_id] = issue_data
-                        
-                        # Get comprehensive sprint information for this issue
-                        if issue_key:
-                            sprint_info_list = self.get_issue_sprints(issue_key)
-                            if sprint_info_list:
-                                # Format sprint information for display (name only)
-                                sprint_names = []
-                                for sprint in sprint_info_list:
-                                    sprint_name = sprint.get('name', 'Unknown')
-                                    sprint_names.append(sprint_name)
-                                issue_sprint_cache[issue_id] = "; ".join(sprint_names)
-                            else:
-                                issue_sprint_cache[issue_id] = 'N/A'
+                for issue_id, issue_details in zip(issue_ids, details):
+                    if issue_details:
+                        issue_details_cache[issue_id], issue_sprint_cache[issue_id] = issue_details
             
             # Step 3: Build final worklog list with cached issue and sprint information
             all_worklogs = []
@@ -301,6 +373,7 @@ class JiraAPIClient:
                 issue_id = worklog.get('issueId')
                 if issue_id in issue_details_cache:
                     issue_data = issue_details_cache[issue_id]
+                    fields = issue_data.get('fields', {})
                     sprint_info = issue_sprint_cache.get(issue_id, 'N/A')
                     
                     comment_obj = worklog.get('comment', {})
@@ -308,9 +381,9 @@ class JiraAPIClient:
                     
                     all_worklogs.append({
                         'issueKey': issue_data.get('key'),
-                        'summary': issue_data.get('fields', {}).get('summary'),
-                        'issueType': issue_data.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
-                        'status': issue_data.get('fields', {}).get('status', {}).get('name', 'N/A'),
+                        'summary': fields.get('summary'),
+                        'issueType': fields.get('issuetype', {}).get('name', 'N/A'),
+                        'status': fields.get('status', {}).get('name', 'N/A'),
                         'author': worklog.get('author', {}).get('displayName', 'Unknown'),
                         'timeSpent': worklog.get('timeSpent', '0m'),
                         'timeSpentHours': round(worklog.get('timeSpentSeconds', 0) / 3600, 2),
@@ -322,7 +395,7 @@ class JiraAPIClient:
             return all_worklogs
             
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching worklogs: {str(e)}")
+            self.log(f"Error fetching worklogs: {str(e)}")
             # Fallback to the original method
             return self._get_worklogs_fallback(project_key, start_date, end_date)
     
@@ -337,29 +410,41 @@ class JiraAPIClient:
         
         try:
             issues_with_worklogs = paginate_request(
-                self.session, search_url, self.headers, params, self.auth
+                self.session, search_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             
             # Step 1: Collect all issues and their worklogs within date range
             filtered_worklogs = []
             unique_issue_keys = set()
+            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+            
+            # Server-side window for issues with more worklogs than the search embeds.
+            # Padded by a day on each side so worklogs in any timezone are returned;
+            # the exact date check below still applies.
+            window_start = datetime.combine(start_date_obj - timedelta(days=1), datetime.min.time(), timezone.utc)
+            window_end = datetime.combine(end_date_obj + timedelta(days=2), datetime.min.time(), timezone.utc)
+            started_after = int(window_start.timestamp() * 1000)
+            started_before = int(window_end.timestamp() * 1000)
             
             for issue in issues_with_worklogs:
                 issue_key = issue.get('key')
-                issue_worklogs = issue.get('fields', {}).get('worklog', {}).get('worklogs', [])
+                worklog_field = issue.get('fields', {}).get('worklog', {})
+                issue_worklogs = worklog_field.get('worklogs', [])
+                
+                # Search results only embed the first page of an issue's worklogs
+                if worklog_field.get('total', 0) > len(issue_worklogs):
+                    issue_worklogs = self._get_issue_worklogs(issue_key, started_after, started_before)
                 
                 for worklog in issue_worklogs:
                     worklog_started_str = worklog.get('started')
-                    if worklog_started_str[-3] != ':':
-                        worklog_started_str = worklog_started_str[:-2] + ':' + worklog_started_str[-2:]
                     
                     # Parse the worklog date and keep it in its original timezone
-                    worklog_datetime = datetime.fromisoformat(worklog_started_str)
+                    worklog_datetime = parse_jira_datetime(worklog_started_str)
                     
                     # Convert to date only for comparison
                     worklog_date = worklog_datetime.date()
-                    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
                     
                     if start_date_obj <= worklog_date <= end_date_obj:
                         filtered_worklogs.append((issue, worklog, worklog_date))
@@ -370,26 +455,19 @@ class JiraAPIClient:
                 return []
             
             # Step 2: Get comprehensive sprint information for each unique issue
-            print(f"Fetching sprint details for {len(unique_issue_keys)} unique issues (fallback method)...")
+            self.log(f"Fetching sprint details for {len(unique_issue_keys)} unique issues (fallback method)...")
             issue_sprint_cache = {}
             
-            for issue_key in unique_issue_keys:
-                sprint_info_list = self.get_issue_sprints(issue_key)
-                if sprint_info_list:
-                    # Format sprint information for display (name only)
-                    sprint_names = []
-                    for sprint in sprint_info_list:
-                        sprint_name = sprint.get('name', 'Unknown')
-                        sprint_names.append(sprint_name)
-                    issue_sprint_cache[issue_key] = "; ".join(sprint_names)
-                else:
-                    issue_sprint_cache[issue_key] = 'N/A'
+            issue_keys = list(unique_issue_keys)
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                issue_sprint_cache = dict(zip(issue_keys, executor.map(self._get_sprint_names, issue_keys)))
             
             # Step 3: Build final worklog list with comprehensive sprint information
             all_worklogs = []
             
             for issue, worklog, worklog_date in filtered_worklogs:
                 issue_key = issue.get('key')
+                fields = issue.get('fields', {})
                 sprint_info = issue_sprint_cache.get(issue_key, 'N/A')
                 
                 comment_obj = worklog.get('comment', {})
@@ -397,9 +475,9 @@ class JiraAPIClient:
                 
                 all_worklogs.append({
                     'issueKey': issue_key,
-                    'summary': issue.get('fields', {}).get('summary'),
-                    'issueType': issue.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
-                    'status': issue.get('fields', {}).get('status', {}).get('name', 'N/A'),
+                    'summary': fields.get('summary'),
+                    'issueType': fields.get('issuetype', {}).get('name', 'N/A'),
+                    'status': fields.get('status', {}).get('name', 'N/A'),
                     'author': worklog.get('author', {}).get('displayName', 'Unknown'),
                     'timeSpent': worklog.get('timeSpent', '0m'),
                     'timeSpentHours': round(worklog.get('timeSpentSeconds', 0) / 3600, 2),
@@ -420,42 +498,48 @@ class JiraAPIClient:
         jql = f'project = "{project_key}" AND updated >= "{start_date}" AND updated <= "{end_date}"'
         params = {
             'jql': jql,
-            'fields': 'summary,status,parent,issuetype,comment',
-            'expand': 'changelog'
+            'fields': 'summary,status,parent,issuetype,comment'
         }
         
         try:
             issues_with_comments = paginate_request(
-                self.session, search_url, self.headers, params, self.auth
+                self.session, search_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             
             all_comments = []
+            start_date_aware = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            end_date_aware = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+            
             for issue in issues_with_comments:
-                comments = issue.get('fields', {}).get('comment', {}).get('comments', [])
+                fields = issue.get('fields', {})
+                comment_field = fields.get('comment', {})
+                comments = comment_field.get('comments', [])
+                
+                # Search results only embed the first page of an issue's comments
+                if comment_field.get('total', 0) > len(comments):
+                    comments = self._get_issue_comments(issue.get('key'))
+                
                 for comment in comments:
                     comment_created_str = comment.get('created')
                     if comment_created_str:
-                        if comment_created_str[-3] != ':':
-                            comment_created_str = comment_created_str[:-2] + ':' + comment_created_str[-2:]
-                        comment_date = datetime.fromisoformat(comment_created_str).astimezone(timezone.utc)
-                        start_date_aware = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-                        end_date_aware = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+                        comment_date = parse_jira_datetime(comment_created_str).astimezone(timezone.utc)
                         
                         if start_date_aware <= comment_date <= end_date_aware:
                             comment_body_obj = comment.get('body', {})
                             comment_body = parse_adf_to_text(comment_body_obj)
                             
                             parent_summary = 'N/A'
-                            parent_field = issue.get('fields', {}).get('parent')
+                            parent_field = fields.get('parent')
                             if parent_field:
                                 parent_summary = parent_field.get('fields', {}).get('summary', 'N/A')
                             
                             all_comments.append({
                                 'issueKey': issue.get('key'),
-                                'summary': issue.get('fields', {}).get('summary'),
-                                'status': issue.get('fields', {}).get('status', {}).get('name', 'N/A'),
+                                'summary': fields.get('summary'),
+                                'status': fields.get('status', {}).get('name', 'N/A'),
                                 'parent_summary': parent_summary,
-                                'issueType': issue.get('fields', {}).get('issuetype', {}).get('name', 'N/A'),
+                                'issueType': fields.get('issuetype', {}).get('name', 'N/A'),
                                 'comment_date': comment_date.strftime('%Y-%m-%d %H:%M:%S'),
                                 'comment_author': comment.get('author', {}).get('displayName', 'Unknown'),
                                 'comment_body': comment_body
@@ -466,6 +550,26 @@ class JiraAPIClient:
         except requests.exceptions.RequestException as e:
             return {'error': str(e)}
     
+    def _get_issue_worklogs(self, issue_key, started_after, started_before):
+        """Fetches the worklogs of a single issue started within the given epoch-millisecond window."""
+        worklog_url = f"{self.base_url}/rest/api/3/issue/{issue_key}/worklog"
+        params = {
+            'startedAfter': started_after,
+            'startedBefore': started_before
+        }
+        return paginate_request(
+            self.session, worklog_url, self.headers, params, self.auth, results_key='worklogs',
+            log=self.log
+        )
+    
+    def _get_issue_comments(self, issue_key):
+        """Fetches all comments of a single issue with pagination."""
+        comments_url = f"{self.base_url}/rest/api/3/issue/{issue_key}/comment"
+        return paginate_request(
+            self.session, comments_url, self.headers, {}, self.auth, results_key='comments',
+            log=self.log
+        )
+    
     def get_epics_by_label(self, project_key, label):
         """
         Fetches all epics in a project that have a specific label.
@@ -486,11 +590,12 @@ class JiraAPIClient:
         
         try:
             epics = paginate_request(
-                self.session, search_url, self.headers, params, self.auth
+                self.session, search_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             return epics
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching epics with label '{label}': {str(e)}")
+            self.log(f"Error fetching epics with label '{label}': {str(e)}")
             return []
     
     def get_issues_in_epic(self, epic_key, jql=None):
@@ -520,7 +625,8 @@ class JiraAPIClient:
         
         try:
             issues = paginate_request(
-                self.session, search_url, self.headers, params, self.auth
+                self.session, search_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             
             # Add sprint information to each issue
@@ -530,7 +636,7 @@ class JiraAPIClient:
             
             return issues
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching issues for epic '{epic_key}': {str(e)}")
+            self.log(f"Error fetching issues for epic '{epic_key}': {str(e)}")
             return []
     
     def _extract_sprint_names(self, issue):
@@ -592,9 +698,10 @@ class JiraAPIClient:
         
         try:
             epics = paginate_request(
-                self.session, search_url, self.headers, params, self.auth
+                self.session, search_url, self.headers, params, self.auth, results_key='issues',
+                log=self.log
             )
             return epics
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching open epics: {str(e)}")
+            self.log(f"Error fetching open epics: {str(e)}")
             return []
@@ -9,6 +9,13 @@ and prepares data for chart generation.
 
 from config import get_story_points
 
+# Maps a Jira status category to the progress bucket its story points count towards.
+# Any other category (To Do, undefined, ...) falls into 'to_do_points'.
+CATEGORY_BUCKET = {
+    'Done': 'done_points',
+    'In Progress': 'in_progress_points'
+}
+
 
 def truncate_epic_name(name, max_length=40):
     """
@@ -26,29 +33,32 @@ def truncate_epic_name(name, max_length=40):
     return name[:max_length] + "..."
 
 
-def calculate_epic_progress(issues):
+def aggregate_issues(issues):
     """
-    Calculates progress data for each epic from a list of issues.
+    Aggregates issues by parent epic in a single pass over the issue list.
+    
+    Produces the data behind calculate_epic_progress(), aggregate_by_epic()
+    and calculate_sprint_composition() at once, so callers that need more
+    than one of them only walk the issues once.
     
     Args:
         issues: List of issue dictionaries from Jira API
         
     Returns:
-        List of dicts with epic progress data, sorted by completion % (highest first).
-        Each dict contains:
-        - epic_key: Parent epic key (or "No Epic")
-        - epic_name: Truncated epic name
-        - done_points: Story points with status category "Done"
-        - in_progress_points: Story points with status category "In Progress"
-        - to_do_points: Story points with status category "To Do"
-        - total_points: Sum of all story points
-        - percentage: Completion percentage (done / total * 100)
+        Dict with keys:
+        - epic_progress: Same as calculate_epic_progress()
+        - epic_groups: Same as aggregate_by_epic()
+        - composition: Same as calculate_sprint_composition()
     """
     epic_data = {}
+    epic_groups = {}
+    sprint_total = 0
     
     for issue in issues:
+        fields = issue.get('fields', {})
+        
         # Get parent epic info
-        parent_field = issue.get('fields', {}).get('parent')
+        parent_field = fields.get('parent')
         if parent_field:
             epic_key = parent_field.get('key', 'No Epic')
             epic_name = parent_field.get('fields', {}).get('summary', epic_key)
@@ -57,8 +67,9 @@ def calculate_epic_progress(issues):
             epic_name = 'No Epic'
         
         # Initialize epic entry if not exists
-        if epic_key not in epic_data:
-            epic_data[epic_key] = {
+        epic_entry = epic_data.get(epic_key)
+        if epic_entry is None:
+            epic_entry = epic_data[epic_key] = {
                 'epic_key': epic_key,
                 'epic_name': truncate_epic_name(epic_name),
                 'done_points': 0,
@@ -66,34 +77,66 @@ def calculate_epic_progress(issues):
                 'to_do_points': 0,
                 'total_points': 0
             }
+            epic_groups[epic_key] = [issue]
+        else:
+            epic_groups[epic_key].append(issue)
         
         # Get story points with fallback logic
-        story_points = get_story_points(issue.get('fields', {}))
+        story_points = get_story_points(fields)
         
         # Get status category
-        status_category = issue.get('fields', {}).get('status', {}).get('statusCategory', {}).get('name', '')
+        status_category = fields.get('status', {}).get('statusCategory', {}).get('name', '')
         
         # Aggregate by status category
-        if status_category == 'Done':
-            epic_data[epic_key]['done_points'] += story_points
-        elif status_category == 'In Progress':
-            epic_data[epic_key]['in_progress_points'] += story_points
-        else:  # To Do or other
-            epic_data[epic_key]['to_do_points'] += story_points
-        
-        epic_data[epic_key]['total_points'] += story_points
+        epic_entry[CATEGORY_BUCKET.get(status_category, 'to_do_points')] += story_points
+        epic_entry['total_points'] += story_points
+        sprint_total += story_points
     
     # Calculate percentages and filter out epics with 0 total points
-    result = []
-    for epic in epic_data.values():
-        if epic['total_points'] > 0:  # Exclude epics with 0 story points
-            epic['percentage'] = (epic['done_points'] / epic['total_points'] * 100) if epic['total_points'] > 0 else 0
-            result.append(epic)
+    epic_progress = []
+    composition = []
+    if sprint_total > 0:  # Otherwise every epic has 0 story points
+        for epic in epic_data.values():
+            total_points = epic['total_points']
+            if total_points > 0:  # Exclude epics with 0 story points
+                epic['percentage'] = epic['done_points'] / total_points * 100
+                epic_progress.append(epic)
+                composition.append({
+                    'epic_key': epic['epic_key'],
+                    'epic_name': epic['epic_name'],
+                    'total_points': total_points,
+                    'percentage': total_points / sprint_total * 100
+                })
     
     # Sort by completion percentage (highest first)
-    result.sort(key=lambda x: x['percentage'], reverse=True)
+    epic_progress.sort(key=lambda x: x['percentage'], reverse=True)
     
-    return result
+    return {
+        'epic_progress': epic_progress,
+        'epic_groups': epic_groups,
+        'composition': composition
+    }
+
+
+def calculate_epic_progress(issues):
+    """
+    Calculates progress data for each epic from a list of issues.
+    
+    Args:
+        issues: List of issue dictionaries from Jira API
+        
+    Returns:
+        List of dicts with epic progress data, sorted by completion % (highest first).
+        Each dict contains:
+        - epic_key: Parent epic key (or "No Epic")
+        - epic_name: Truncated epic name
+        - done_points: Story points with status category "Done"
+        - in_progress_points: Story points with status category "In Progress"
+        - to_do_points: Story points with status category "To Do"
+        - total_points: Sum of all story points
+        - percentage: Completion percentage (done / total * 100)
+    """
+    return aggregate_issues(issues)['epic_progress']
 
 
 def aggregate_by_epic(issues):
@@ -106,22 +149,7 @@ def aggregate_by_epic(issues):
     Returns:
         Dict with epic keys as keys and lists of issues as values
     """
-    epic_groups = {}
-    
-    for issue in issues:
-        # Get parent epic key
-        parent_field = issue.get('fields', {}).get('parent')
-        if parent_field:
-            epic_key = parent_field.get('key', 'No Epic')
-        else:
-            epic_key = 'No Epic'
-        
-        if epic_key not in epic_groups:
-            epic_groups[epic_key] = []
-        
-        epic_groups[epic_key].append(issue)
-    
-    return epic_groups
+    return aggregate_issues(issues)['epic_groups']
 
 
 def calculate_sprint_composition(issues):
@@ -139,41 +167,7 @@ def calculate_sprint_composition(issues):
         - total_points: Total story points for this epic
         - percentage: Percentage of sprint total
     """
-    epic_totals = {}
-    sprint_total = 0
-    
-    for issue in issues:
-        # Get parent epic info
-        parent_field = issue.get('fields', {}).get('parent')
-        if parent_field:
-            epic_key = parent_field.get('key', 'No Epic')
-            epic_name = parent_field.get('fields', {}).get('summary', epic_key)
-        else:
-            epic_key = 'No Epic'
-            epic_name = 'No Epic'
-        
-        # Initialize epic entry if not exists
-        if epic_key not in epic_totals:
-            epic_totals[epic_key] = {
-                'epic_key': epic_key,
-                'epic_name': truncate_epic_name(epic_name),
-                'total_points': 0
-            }
-        
-        # Get story points with fallback logic
-        story_points = get_story_points(issue.get('fields', {}))
-        
-        epic_totals[epic_key]['total_points'] += story_points
-        sprint_total += story_points
-    
-    # Calculate percentages and filter out epics with 0 total points
-    result = []
-    for epic in epic_totals.values():
-        if epic['total_points'] > 0:  # Exclude epics with 0 story points
-            epic['percentage'] = (epic['total_points'] / sprint_total * 100) if sprint_total > 0 else 0
-            result.append(epic)
-    
-    return result
+    return aggregate_issues(issues)['composition']
 
 
 def filter_issues_by_sheet(all_issues, sheet_type):
@@ -7,36 +7,45 @@ This script runs the Streamlit GUI on the port specified in JiraExtractor.env
 
 import os
 import sys
-import subprocess
-from dotenv import load_dotenv
+from dotenv import dotenv_values
+
+CONFIG_FILE = 'JiraExtractor.env'
+DEFAULT_PORT = '8501'
+
+# Streamlit command line; only the port varies between launches
+STREAMLIT_ARGV = (
+    "streamlit", "run",
+    "streamlit_app.py",
+    "--server.address", "localhost",
+    "--browser.gatherUsageStats", "false"
+)
+
+def get_streamlit_port():
+    """
+    Reads STREAMLIT_PORT without loading the whole env file into os.environ.
+    
+    As with load_dotenv, a value already set in the environment wins over the file.
+    """
+    return os.environ.get('STREAMLIT_PORT') or dotenv_values(CONFIG_FILE).get('STREAMLIT_PORT') or DEFAULT_PORT
 
 def main():
     """Main entry point for the GUI launcher."""
     print("🚀 Starting Jira Data Extractor GUI...")
     
-    # Load environment variables from JiraExtractor.env
-    config_file = 'JiraExtractor.env'
-    load_dotenv(config_file)
-    
-    # Get port from JiraExtractor.env file or use default
-    port = os.getenv('STREAMLIT_PORT', '8501')
+    # Get port from the environment, the JiraExtractor.env file, or use default
+    port = get_streamlit_port()
     
     print(f"🌐 Starting Streamlit on port {port}")
     print(f"📊 Streamlit interface will open in your default browser")
     print(f"🛑 Press Ctrl+C to stop the server")
     
-    # Build the streamlit command
-    cmd = [
-        sys.executable, "-m", "streamlit", "run",
-        "streamlit_app.py",
-        "--server.port", str(port),
-        "--server.address", "localhost",
-        "--browser.gatherUsageStats", "false"
-    ]
+    sys.argv = [*STREAMLIT_ARGV, "--server.port", str(port)]
     
     try:
-        # Run streamlit
-        subprocess.run(cmd, check=True)
+        # Run streamlit in this process rather than spawning a second interpreter.
+        # Imported here on purpose, so a missing Streamlit gets the friendly error below.
+        from streamlit.web import cli as stcli
+        stcli.main()
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
     except Exception as e:
@@ -7,11 +7,41 @@ A simple web-based user interface for the Jira API Extractor using Streamlit.
 
 import streamlit as st
 import os
+import queue
+import re
+import shutil
 import sys
-import subprocess
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import date, datetime, timedelta
 from io import StringIO
+from dotenv import dotenv_values
+
+from config import get_config_file_path
+from jira_api import JiraAPIClient, create_session
+from main import run_export
+
+# The user's JiraExtractor.env file (the path is fixed for the lifetime of the app)
+CONFIG_FILE_PATH = get_config_file_path()
+CONFIG_FILE_NAME = os.path.basename(CONFIG_FILE_PATH)
+CONFIG_FILE_LOCATION = os.path.abspath(CONFIG_FILE_PATH)
+
+# The extraction log shows only the most recent lines, refreshed a few times per second
+LOG_MAX_LINES = 500
+LOG_REFRESH_SECONDS = 0.25
+
+# Progress bar value and text for each milestone message printed by the export
+PROGRESS_STEPS = {
+    "Fetching issues": (0.2, "Fetching sprint issues..."),
+    "Fetching epics with label": (0.3, "Fetching epics with label..."),
+    "Fetching open epics": (0.4, "Fetching open epics..."),
+    "Fetching work logs": (0.5, "Fetching work logs..."),
+    "Fetching comments": (0.7, "Fetching comments..."),
+    "Saving data to Excel": (0.9, "Generating Excel file..."),
+    "Export complete": (1.0, "✅ Export completed successfully!")
+}
+PROGRESS_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in PROGRESS_STEPS))
 
 # Configure Streamlit page
 st.set_page_config(
@@ -21,48 +51,50 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def get_config_file_path():
-    """Get the path for the user's JiraExtractor.env file."""
-    return 'JiraExtractor.env'
+@st.cache_data(max_entries=4)
+def read_env_file(path, mtime):
+    """
+    Parses the KEY=VALUE lines of an env file.
+    
+    The file's modification time is part of the cache key, so the file is only
+    re-parsed after it changes rather than on every rerun. Each save adds a new
+    key, so only the most recent entries are kept.
+    """
+    # Open the file here so a missing or unreadable file raises (dotenv_values would return {})
+    with open(path, 'r') as f:
+        values = dotenv_values(stream=f, interpolate=False)
+    # Keys without '=' have no value; skip them as before
+    return {key: value for key, value in values.items() if value is not None}
 
 def load_bundled_template():
     """Load the bundled .env.example template."""
-    config = {}
     template_paths = ['.env.example', 'env.example']  # Try multiple locations
     
     for template_path in template_paths:
-        if os.path.exists(template_path):
-            try:
-                with open(template_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if '=' in line and not line.startswith('#'):
-                            key, value = line.split('=', 1)
-                            # Only load non-placeholder values
-                            value = value.strip('"').strip("'")
-                            if not value.startswith('your-') and value != 'your-api-token':
-                                config[key] = value
-                break
-            except Exception:
-                continue
-    return config
+        try:
+            template = read_env_file(template_path, os.path.getmtime(template_path))
+        except Exception:  # Missing or unreadable, try the next location
+            continue
+        # Only load non-placeholder values
+        return {key: value for key, value in template.items() if not value.startswith('your-')}
+    return {}
+
+def load_saved_config():
+    """Load the user's saved JiraExtractor.env file ({} if it does not exist yet)."""
+    try:
+        return read_env_file(CONFIG_FILE_PATH, os.path.getmtime(CONFIG_FILE_PATH))
+    except FileNotFoundError:
+        return {}
 
 def load_config():
     """Load configuration from user's JiraExtractor.env file or bundled template."""
-    config_path = get_config_file_path()
     config = {}
     
     # First, try to load user's saved config
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.split('=', 1)
-                        config[key] = value.strip('"').strip("'")
-        except Exception as e:
-            st.warning(f"Could not load saved config: {e}")
+    try:
+        config = load_saved_config()
+    except Exception as e:
+        st.warning(f"Could not load saved config: {e}")
     
     # If no user config, try to load from bundled template
     if not config:
@@ -72,7 +104,28 @@ def load_config():
 
 def save_config(url, email, token):
     """Save configuration to user's JiraExtractor.env file."""
-    config_path = get_config_file_path()
+    config_path = CONFIG_FILE_PATH
+    
+    try:
+        saved_config = load_saved_config()
+    except Exception:
+        saved_config = {}
+    
+    # Keep the optional port setting. The saved file wins: importing config loads it into
+    # os.environ once at startup, so the environment may hold a value edited since.
+    port = saved_config.get('STREAMLIT_PORT') or os.environ.get('STREAMLIT_PORT')
+    
+    new_config = {
+        'JIRA_API_URL': url,
+        'JIRA_USER_EMAIL': email,
+        'JIRA_API_TOKEN': token
+    }
+    if port:
+        new_config['STREAMLIT_PORT'] = port
+    
+    # Nothing to write if the saved file already holds exactly these values
+    if saved_config == new_config:
+        return True
     
     try:
         # Ensure the directory exists (only if there's a directory path)
@@ -80,14 +133,32 @@ def save_config(url, email, token):
         if config_dir:  # Only create directory if path has a directory component
             os.makedirs(config_dir, exist_ok=True)
         
-        with open(config_path, 'w') as f:
-            f.write(f'JIRA_API_URL="{url}"\n')
-            f.write(f'JIRA_USER_EMAIL="{email}"\n')
-            f.write(f'JIRA_API_TOKEN="{token}"\n')
-            
-            # Add optional port setting if it exists in environment
-            if 'STREAMLIT_PORT' in os.environ:
-                f.write(f'STREAMLIT_PORT={os.environ["STREAMLIT_PORT"]}\n')
+        content = (
+            f'JIRA_API_URL="{url}"\n'
+            f'JIRA_USER_EMAIL="{email}"\n'
+            f'JIRA_API_TOKEN="{token}"\n'
+        )
+        
+        # Add optional port setting if it was configured
+        if port:
+            content += f'STREAMLIT_PORT={port}\n'
+        
+        # Write a temporary file next to the config and swap it in, so the config
+        # is never left half-written if the app stops mid-save. It holds the API
+        # token, so it is created private and then given the saved file's mode.
+        temp_path = config_path + '.tmp'
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                if os.path.exists(config_path):
+                    shutil.copymode(config_path, temp_path)
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, config_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
         
         return True
     except Exception as e:
@@ -95,152 +166,126 @@ def save_config(url, email, token):
         st.error(f"Attempted to save to: {config_path}")
         return False
 
-def run_extraction(project, sprint_ids, start_date, end_date, epic_label, progress_placeholder, log_placeholder):
+@st.cache_resource
+def get_jira_session():
+    """
+    Returns the HTTP session shared by all extractions.
+    
+    Its connection pool (and the TLS connections in it) survives between
+    extractions instead of being rebuilt for every run. Credentials are sent
+    per request and the session keeps no cookies, so each run still builds its
+    own client around it and none of them can pick up another's Jira session.
+    """
+    return create_session()
+
+def render_log(log_placeholder, output_lines):
+    """Shows the extraction log in a fixed-height box, replacing the previous content."""
+    with log_placeholder.container():
+        st.caption("Extraction Log:")
+        st.container(height=200).code("\n".join(output_lines), language=None)
+
+def run_extraction(jira_url, jira_auth, project, sprint_ids, start_date, end_date, epic_label, progress_placeholder, log_placeholder):
     """Run the Jira data extraction with progress updates."""
     
-    # Prepare command
-    cmd = [sys.executable, "main.py", "--project", project]
+    lines = queue.Queue()
+    result = {'success': False}
     
-    if sprint_ids:
-        cmd.extend(["--sprint", sprint_ids])
+    def log(message):
+        # Called from the export thread and its workers; only this run's lines go on
+        # this run's queue, so concurrent extractions (other browser tabs) stay apart
+        for line in str(message).split('\n'):
+            lines.put(line)
     
-    if epic_label:
-        cmd.extend(["--epic_label", epic_label])
+    jira_client = JiraAPIClient(base_url=jira_url, auth=jira_auth, session=get_jira_session(), log=log)
     
-    if start_date and end_date:
-        cmd.extend([
-            "--start_date", start_date.strftime("%Y-%m-%d"),
-            "--end_date", end_date.strftime("%Y-%m-%d")
-        ])
+    def export():
+        # Runs main.run_export in this process, reporting through log instead of stdout
+        try:
+            result['success'] = run_export(
+                project,
+                sprint=sprint_ids or None,
+                start_date=start_date.strftime("%Y-%m-%d") if start_date and end_date else None,
+                end_date=end_date.strftime("%Y-%m-%d") if start_date and end_date else None,
+                epic_label=epic_label or None,
+                jira_client=jira_client,
+                log=log
+            )
+        except Exception as e:
+            log(f"Error running extraction: {str(e)}")
     
-    try:
-        # Run the command and capture output
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+    worker = threading.Thread(target=export, daemon=True)
+    worker.start()
+    
+    output_lines = deque(maxlen=LOG_MAX_LINES)
+    progress = 0.1  # Set by the caller before starting
+    log_is_stale = False
+    last_refresh = time.monotonic()
+    
+    # Read output until the export finishes and the queue is drained
+    while worker.is_alive() or not lines.empty():
+        try:
+            batch = [lines.get(timeout=0.1)]
+        except queue.Empty:
+            batch = []
         
-        output_lines = []
+        # Take every other line already waiting, so a burst costs a single refresh
+        while True:
+            try:
+                batch.append(lines.get_nowait())
+            except queue.Empty:
+                break
         
-        # Read output line by line
-        for line in iter(process.stdout.readline, ''):
+        reached_milestone = False
+        for line in batch:
             if line:
                 output_lines.append(line.strip())
-                # Update the log display
-                log_placeholder.text_area(
-                    "Extraction Log:",
-                    value="\n".join(output_lines),
-                    height=200,
-                    key=f"log_{len(output_lines)}"
-                )
+                log_is_stale = True
                 
                 # Update progress based on keywords in output
-                if "Fetching issues" in line:
-                    progress_placeholder.progress(0.2, "Fetching sprint issues...")
-                elif "Fetching epics with label" in line:
-                    progress_placeholder.progress(0.3, "Fetching epics with label...")
-                elif "Fetching open epics" in line:
-                    progress_placeholder.progress(0.4, "Fetching open epics...")
-                elif "Fetching work logs" in line:
-                    progress_placeholder.progress(0.5, "Fetching work logs...")
-                elif "Fetching comments" in line:
-                    progress_placeholder.progress(0.7, "Fetching comments...")
-                elif "Saving data to Excel" in line:
-                    progress_placeholder.progress(0.9, "Generating Excel file...")
-                elif "Export complete" in line:
-                    progress_placeholder.progress(1.0, "✅ Export completed successfully!")
-        
-        process.wait()
+                # (never moving the bar back: per-epic "Fetching issues" lines follow later steps)
+                milestone = PROGRESS_PATTERN.search(line)
+                if milestone and PROGRESS_STEPS[milestone.group(0)][0] > progress:
+                    progress, progress_text = PROGRESS_STEPS[milestone.group(0)]
+                    progress_placeholder.progress(progress, progress_text)
+                    reached_milestone = True
         
-        if process.returncode == 0:
-            return True, "\n".join(output_lines)
-        else:
-            return False, "\n".join(output_lines)
-            
-    except Exception as e:
-        return False, f"Error running extraction: {str(e)}"
-
-def main():
-    """Main Streamlit application."""
-    
-    # Header
-    st.title("📊 Jira Data Extractor")
-    st.markdown("Extract Jira data including sprint issues, worklogs, and comments to Excel with rich visualizations.")
+        # Update the log display at most every LOG_REFRESH_SECONDS (and at every milestone)
+        if log_is_stale and (reached_milestone or time.monotonic() - last_refresh >= LOG_REFRESH_SECONDS):
+            render_log(log_placeholder, output_lines)
+            log_is_stale = False
+            last_refresh = time.monotonic()
     
-    # Load existing configuration
-    config = load_config()
+    # Show any lines received since the last refresh
+    render_log(log_placeholder, output_lines)
     
-    # Sidebar for configuration
-    with st.sidebar:
-        st.header("🔧 Configuration")
-        
-        # Jira Configuration
-        st.subheader("Jira Settings")
-        
-        jira_url = st.text_input(
-            "Jira URL",
-            value=config.get('JIRA_API_URL', ''),
-            placeholder="https://your-domain.atlassian.net",
-            help="Your Jira instance URL"
-        )
-        
-        jira_email = st.text_input(
-            "Email",
-            value=config.get('JIRA_USER_EMAIL', ''),
-            placeholder="your-email@example.com",
-            help="The email address you use to log in to Jira"
-        )
-        
-        jira_token = st.text_input(
-            "API Token",
-            value=config.get('JIRA_API_TOKEN', ''),
-            type="password",
-            placeholder="Your Jira API token",
-            help="Generate one at: https://id.atlassian.com/manage-profile/security/api-tokens"
-        )
-        
-        # Save configuration button
-        if st.button("💾 Save Configuration", use_container_width=True):
-            if jira_url and jira_email and jira_token:
-                if save_config(jira_url, jira_email, jira_token):
-                    config_path = get_config_file_path()
-                    st.success("✅ Configuration saved!")
-                    st.info(f"📁 Saved to: {os.path.basename(config_path)}")
-                    st.info(f"📍 Location: {os.path.abspath(config_path)}")
-                    st.rerun()
-            else:
-                st.error("❌ Please fill in all configuration fields")
-        
-        # Configuration status
-        config_path = get_config_file_path()
-        if jira_url and jira_email and jira_token:
-            if os.path.exists(config_path):
-                st.success("✅ Configuration complete")
-                st.info(f"📁 Config file: {os.path.basename(config_path)}")
-            else:
-                st.warning("⚠️ Configuration complete but not saved. Click 'Save Configuration' to persist settings.")
-        else:
-            if os.path.exists(config_path):
-                st.info(f"📝 Found existing config: {os.path.basename(config_path)}")
-            else:
-                st.warning("⚠️ Please configure your Jira settings")
-        
-        # Shutdown section
-        st.markdown("---")
-        st.markdown("### 🔴 App Control")
-        if st.button("🛑 Stop Server", use_container_width=True, type="secondary"):
-            st.warning("🔄 Shutting down server...")
-            st.info("You can close this browser tab now.")
-            # Give the UI time to update before shutdown
-            time.sleep(1)
-            # Graceful shutdown
-            os._exit(0)
+    return result['success'], "\n".join(output_lines)
+
+def last_week_range(today):
+    """Returns the (start, end) dates of the last full week (Monday to Sunday) before today."""
+    end = today - timedelta(days=today.weekday() + 1)
+    return end - timedelta(days=6), end
+
+def last_month_range(today):
+    """Returns the (start, end) dates of the calendar month before today."""
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+def apply_quick_range(date_range):
+    """Fills both date inputs from a Quick Select range, before the panel reruns."""
+    st.session_state['start_date_input'], st.session_state['end_date_input'] = date_range(date.today())
+
+def uppercase_project_key():
+    """Normalizes the Project Key input to upper case, once per edit."""
+    st.session_state['project_key'] = st.session_state['project_key'].upper()
+
+@st.fragment
+def extraction_panel(jira_url, jira_email, jira_token):
+    """
+    Renders the extraction parameters and the run/download controls.
     
-    # Main content area
+    Runs as a fragment: interacting with these widgets reruns only this panel,
+    not the sidebar and its configuration loading.
+    """
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -249,10 +294,11 @@ def main():
         # Project Key
         project_key = st.text_input(
             "Project Key",
-            value="",
             placeholder="e.g., NG",
-            help="The key for your Jira project"
-        ).upper()
+            help="The key for your Jira project",
+            key="project_key",
+            on_change=uppercase_project_key
+        )
         
         # Sprint IDs
         sprint_ids = st.text_input(
@@ -273,19 +319,13 @@ def main():
         st.subheader("📅 Date Range (Optional)")
         st.markdown("*Use date range to extract worklogs and comments*")
         
-        # Initialize session state for dates if not exists
-        if 'quick_start_date' not in st.session_state:
-            st.session_state['quick_start_date'] = None
-        if 'quick_end_date' not in st.session_state:
-            st.session_state['quick_end_date'] = None
-        
         # Date inputs with date picker
         col_start, col_end = st.columns(2)
         
         with col_start:
             start_date = st.date_input(
                 "Start Date",
-                value=st.session_state['quick_start_date'],
+                value=None,
                 help="Start date for worklogs and comments",
                 key="start_date_input"
             )
@@ -293,7 +333,7 @@ def main():
         with col_end:
             end_date = st.date_input(
                 "End Date",
-                value=st.session_state['quick_end_date'],
+                value=None,
                 help="End date for worklogs and comments",
                 key="end_date_input"
             )
@@ -303,22 +343,10 @@ def main():
         col_week, col_month = st.columns(2)
         
         with col_week:
-            if st.button("📅 Last Week", use_container_width=True):
-                end_date_calc = datetime.now() - timedelta(days=datetime.now().weekday() + 1)
-                start_date_calc = end_date_calc - timedelta(days=6)
-                st.session_state['quick_start_date'] = start_date_calc.date()
-                st.session_state['quick_end_date'] = end_date_calc.date()
-                st.rerun()
+            st.button("📅 Last Week", use_container_width=True, on_click=apply_quick_range, args=(last_week_range,))
         
         with col_month:
-            if st.button("📅 Last Month", use_container_width=True):
-                today = datetime.now()
-                first_day_of_month = today.replace(day=1)
-                end_date_calc = first_day_of_month - timedelta(days=1)
-                start_date_calc = end_date_calc.replace(day=1)
-                st.session_state['quick_start_date'] = start_date_calc.date()
-                st.session_state['quick_end_date'] = end_date_calc.date()
-                st.rerun()
+            st.button("📅 Last Month", use_container_width=True, on_click=apply_quick_range, args=(last_month_range,))
     
     with col2:
         st.header("🚀 Extraction")
@@ -353,6 +381,9 @@ def main():
         # Run button
         if st.button("🚀 Run Extraction", disabled=not can_run, use_container_width=True, type="primary"):
             if can_run:
+                # Drop the previous export's download
+                st.session_state.pop('export_file', None)
+                
                 # Initialize progress and log areas
                 progress_placeholder = st.empty()
                 log_placeholder = st.empty()
@@ -361,6 +392,8 @@ def main():
                 
                 # Run extraction
                 success, output = run_extraction(
+                    jira_url,
+                    (jira_email, jira_token),
                     project_key, 
                     sprint_ids, 
                     start_date, 
@@ -373,21 +406,113 @@ def main():
                 if success:
                     st.success("🎉 Extraction completed successfully!")
                     
-                    # Check if Excel file was created
-                    if os.path.exists("JiraExport.xlsx"):
-                        st.info("📁 Excel file created: JiraExport.xlsx")
-                        
-                        # Offer download
+                    # A successful run always writes the workbook; read it once so reruns
+                    # (including the one triggered by the download button itself) reuse the bytes
+                    try:
                         with open("JiraExport.xlsx", "rb") as file:
-                            st.download_button(
-                                label="📥 Download Excel File",
-                                data=file.read(),
-                                file_name=f"JiraExport_{project_key}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                use_container_width=True
-                            )
+                            st.session_state['export_file'] = {
+                                'data': file.read(),
+                                'file_name': f"JiraExport_{project_key}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+                            }
+                        st.info("📁 Excel file created: JiraExport.xlsx")
+                    except FileNotFoundError:
+                        st.error("❌ JiraExport.xlsx was not found after the extraction.")
                 else:
                     st.error("❌ Extraction failed. Check the log for details.")
+        
+        # Offer download of the last export
+        export_file = st.session_state.get('export_file')
+        if export_file:
+            st.download_button(
+                label="📥 Download Excel File",
+                data=export_file['data'],
+                file_name=export_file['file_name'],
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
+
+def main():
+    """Main Streamlit application."""
+    
+    # Header
+    st.title("📊 Jira Data Extractor")
+    st.markdown("Extract Jira data including sprint issues, worklogs, and comments to Excel with rich visualizations.")
+    
+    # Load existing configuration
+    config = load_config()
+    
+    # Sidebar for configuration
+    with st.sidebar:
+        st.header("🔧 Configuration")
+        
+        # Jira Configuration
+        st.subheader("Jira Settings")
+        
+        # A form, so typing in these fields does not rerun the app on every edit;
+        # the values are submitted together with the Save button
+        with st.form("config_form"):
+            jira_url = st.text_input(
+                "Jira URL",
+                value=config.get('JIRA_API_URL', ''),
+                placeholder="https://your-domain.atlassian.net",
+                help="Your Jira instance URL"
+            )
+            
+            jira_email = st.text_input(
+                "Email",
+                value=config.get('JIRA_USER_EMAIL', ''),
+                placeholder="your-email@example.com",
+                help="The email address you use to log in to Jira"
+            )
+            
+            jira_token = st.text_input(
+                "API Token",
+                value=config.get('JIRA_API_TOKEN', ''),
+                type="password",
+                placeholder="Your Jira API token",
+                help="Generate one at: https://id.atlassian.com/manage-profile/security/api-tokens"
+            )
+            
+            submitted = st.form_submit_button("💾 Save Configuration", use_container_width=True)
+        
+        # Save configuration
+        if submitted:
+            if jira_url and jira_email and jira_token:
+                if save_config(jira_url, jira_email, jira_token):
+                    st.success("✅ Configuration saved!")
+                    st.info(f"📁 Saved to: {CONFIG_FILE_NAME}")
+                    st.info(f"📍 Location: {CONFIG_FILE_LOCATION}")
+                    st.rerun()
+            else:
+                st.error("❌ Please fill in all configuration fields")
+        
+        # Configuration status
+        config_exists = os.path.exists(CONFIG_FILE_PATH)
+        if jira_url and jira_email and jira_token:
+            if config_exists:
+                st.success("✅ Configuration complete")
+                st.info(f"📁 Config file: {CONFIG_FILE_NAME}")
+            else:
+                st.warning("⚠️ Configuration complete but not saved. Click 'Save Configuration' to persist settings.")
+        else:
+            if config_exists:
+                st.info(f"📝 Found existing config: {CONFIG_FILE_NAME}")
+            else:
+                st.warning("⚠️ Please configure your Jira settings")
+        
+        # Shutdown section
+        st.markdown("---")
+        st.markdown("### 🔴 App Control")
+        if st.button("🛑 Stop Server", use_container_width=True, type="secondary"):
+            st.warning("🔄 Shutting down server...")
+            st.info("You can close this browser tab now.")
+            # Give the UI time to update before shutdown
+            time.sleep(1)
+            # Graceful shutdown
+            os._exit(0)
+    
+    # Main content area (a fragment, so editing parameters does not rerun the sidebar)
+    extraction_panel(jira_url, jira_email, jira_token)
     
     # Footer
     st.markdown("---")
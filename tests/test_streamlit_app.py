@@ -0,0 +1,44 @@
+"""Tests for saving the GUI configuration file."""
+
+import os
+import stat
+
+import pytest
+
+streamlit_app = pytest.importorskip("streamlit_app")
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = tmp_path / "JiraExtractor.env"
+    monkeypatch.setattr(streamlit_app, "CONFIG_FILE_PATH", str(path))
+    monkeypatch.delenv("STREAMLIT_PORT", raising=False)
+    return path
+
+
+def test_save_config_keeps_file_mode(config_path):
+    config_path.write_text('JIRA_API_TOKEN="old"\n')
+    os.chmod(config_path, 0o600)
+
+    assert streamlit_app.save_config("https://example.atlassian.net", "me@example.com", "new")
+
+    assert stat.S_IMODE(os.stat(config_path).st_mode) == 0o600
+    assert 'JIRA_API_TOKEN="new"' in config_path.read_text()
+
+
+def test_save_config_creates_private_file(config_path):
+    assert streamlit_app.save_config("https://example.atlassian.net", "me@example.com", "token")
+
+    assert stat.S_IMODE(os.stat(config_path).st_mode) == 0o600
+
+
+def test_save_config_removes_temp_file_on_failure(config_path, monkeypatch):
+    def failing_fsync(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(streamlit_app.os, "fsync", failing_fsync)
+
+    assert not streamlit_app.save_config("https://example.atlassian.net", "me@example.com", "token")
+
+    assert not os.path.exists(str(config_path) + ".tmp")
+    assert not config_path.exists()
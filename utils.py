@@ -1,23 +1,96 @@
 """Utility functions for Jira API Extractor."""
 
+import re
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+def _iter_adf_text(root):
+    """Yields the text of every text node in an ADF tree, in document order."""
+    # Explicit stack instead of recursive generators, which cost a generator frame
+    # per node and re-yield every text through each enclosing level
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get('type') == 'text':
+                yield node.get('text', '')
+            children = node.get('content')
+            if children:
+                # Reversed, so the first child is popped next
+                stack.extend(reversed(children))
+
 def parse_adf_to_text(adf):
     """Parses an Atlassian Document Format object into a plain text string."""
     if not isinstance(adf, dict) or 'content' not in adf:
         # If it's not a valid ADF object, return it as is (might be a simple string).
         return str(adf)
 
-    text_content = []
-    for block in adf.get('content', []):
-        if block.get('type') == 'paragraph':
-            for item in block.get('content', []):
-                if item.get('type') == 'text':
-                    text_content.append(item.get('text', ''))
-    return " ".join(text_content)
+    # Walk every block type (paragraphs, headings, lists, tables...), not just paragraphs
+    return " ".join(_iter_adf_text(adf))
+
+# Jira timestamps use a "+0000" offset, which fromisoformat only accepts as "+00:00"
+_TZ_OFFSET_RE = re.compile(r'([+-]\d{2})(\d{2})$')
+
+def parse_jira_datetime(value):
+    """Parses a Jira timestamp (e.g. 2024-01-15T10:30:00.000+0000) into an aware datetime."""
+    return datetime.fromisoformat(_TZ_OFFSET_RE.sub(r'\1:\2', value, count=1))
+
+# Upper bound on pages fetched at once across all paginated requests, including
+# the offset pages each request prefetches once its first page reports the total
+MAX_CONCURRENT_PAGES = 8
+_page_slots = threading.BoundedSemaphore(MAX_CONCURRENT_PAGES)
+
+# (connect, read) timeout in seconds for every Jira request, so a stalled
+# connection raises instead of hanging the export
+REQUEST_TIMEOUT = (10, 60)
+
+# Attempts per page when the connection drops while the body is being read. Refused
+# connections, read timeouts, rate limiting and 5xx responses are retried by the
+# session's adapter (see create_session); a body cut off mid-stream is not.
+PAGE_ATTEMPTS = 3
+
+def _get_page_data(session, url, headers, params, auth):
+    """GETs one page and returns its JSON, retrying a truncated response body with backoff."""
+    for attempt in range(PAGE_ATTEMPTS):
+        try:
+            with _page_slots:
+                response = session.get(url, headers=headers, params=params, auth=auth, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                return response.json()
+        except requests.exceptions.ChunkedEncodingError:
+            if attempt == PAGE_ATTEMPTS - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+def _find_results_key(data):
+    """Returns the key holding the results in a paginated Jira response, or None if there is none."""
+    if isinstance(data, dict):
+        for key in ('issues', 'values', 'comments', 'worklogs'):
+            if key in data:
+                return key
+    return None
+
+def _extract_page_results(data, results_key):
+    """Return (results, total) from a paginated Jira response."""
+    if results_key:
+        return data.get(results_key, []), data.get('total', 0)
+    
+    # Fallback for other response structures
+    results = data if isinstance(data, list) else [data]
+    return results, len(results)
 
-def paginate_request(session, url, headers, params, auth, max_results_key='maxResults', start_at_key='startAt'):
+def paginate_request(session, url, headers, params, auth, max_results_key='maxResults', start_at_key='startAt',
+                     results_key=None, log=print):
     """
     Generic pagination handler for Jira API requests.
     
+    Offset-based endpoints that report a total have their remaining pages fetched
+    concurrently once the first page is in; token- and time-based endpoints are
+    followed page by page.
+    
     Args:
         session: requests session object
         url: API endpoint URL
@@ -26,6 +99,9 @@ def paginate_request(session, url, headers, params, auth, max_results_key='maxRe
         auth: authentication tuple
         max_results_key: parameter name for max results per page
         start_at_key: parameter name for pagination offset
+        results_key: response key holding the results (e.g. 'issues'); detected
+            from the first page when not given
+        log: Callable that receives error messages (defaults to print)
     
     Returns:
         List of all results from paginated requests
@@ -38,36 +114,88 @@ def paginate_request(session, url, headers, params, auth, max_results_key='maxRe
     params = params.copy()
     params[max_results_key] = max_results
     
+    # Offset pages are prefetched concurrently until one comes back short
+    prefetch = True
+    
+    def fetch_page(page_start_at):
+        page_params = dict(params, **{start_at_key: page_start_at})
+        return _extract_page_results(_get_page_data(session, url, headers, page_params, auth), results_key)[0]
+    
     while True:
         params[start_at_key] = start_at
         
         try:
-            response = session.get(url, headers=headers, params=params, auth=auth)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Handle different response structures
-            if 'issues' in data:
-                results = data['issues']
-                total = data.get('total', 0)
-            elif 'values' in data:
-                results = data['values']
-                total = data.get('total', 0)
-            else:
-                # Fallback for other response structures
-                results = data if isinstance(data, list) else [data]
-                total = len(results)
+            data = _get_page_data(session, url, headers, params, auth)
             
+            # Handle different response structures (looked up once, all pages share it)
+            if results_key is None:
+                results_key = _find_results_key(data)
+            results, total = _extract_page_results(data, results_key)
             all_results.extend(results)
             
-            # Check if we've retrieved all results
-            if len(results) < max_results or start_at + len(results) >= total:
+            # Token-based pagination (e.g. /rest/api/3/search/jql), which has no 'total'
+            if 'nextPageToken' in data or 'isLast' in data:
+                next_page_token = data.get('nextPageToken')
+                if data.get('isLast') or not next_page_token:
+                    break
+                params['nextPageToken'] = next_page_token
+                continue
+            
+            # Time-based pagination (e.g. /rest/api/3/worklog/updated)
+            if 'lastPage' in data:
+                if data['lastPage'] or 'until' not in data:
+                    break
+                params['since'] = data['until']
+                continue
+            
+            # Offset-based pagination. With a total, only reaching it (or an empty page) ends
+            # the paging, since a page can come back short before the end. Without one, a
+            # page smaller than the page size the server actually applied (which may be
+            # lower than the one requested) is the last.
+            has_total = isinstance(data, dict) and 'total' in data
+            if has_total:
+                is_last_page = not results or start_at + len(results) >= total
+            else:
+                page_size = data.get(max_results_key, max_results) if isinstance(data, dict) else max_results
+                is_last_page = not results or len(results) < page_size
+            if is_last_page:
                 break
                 
             start_at += len(results)
             
-        except Exception as e:
-            print(f"Error during pagination at offset {start_at}: {str(e)}")
+            # The total is known, so request the remaining pages at once, stepping by the
+            # number of items the server actually returned for the first page
+            if prefetch and has_total:
+                page_stride = len(results)
+                offsets = range(start_at, total, page_stride)
+                short_page = None
+                with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_PAGES, len(offsets))) as executor:
+                    pages = [executor.submit(fetch_page, offset) for offset in offsets]
+                    try:
+                        for start_at, page in zip(offsets, pages):
+                            page_results = page.result()
+                            all_results.extend(page_results)
+                            if len(page_results) < page_stride:
+                                short_page = page_results
+                                break
+                    finally:
+                        # After a short or failed page, don't wait for pages not yet started
+                        for pending in pages:
+                            pending.cancel()
+                
+                if short_page is None or start_at + len(short_page) >= total:
+                    break
+                
+                # A short page before the end means the later offsets no longer line up
+                # with the server's pages; continue one page at a time from here
+                start_at += len(short_page)
+                prefetch = False
+            
+        except requests.exceptions.RequestException as e:
+            log(f"Error during pagination at offset {start_at}: {str(e)}")
+            break
+        except ValueError as e:  # Response body was not JSON
+            log(f"Invalid response during pagination at offset {start_at}: {str(e)}")
             break
     
     return all_results